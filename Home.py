@@ -8,16 +8,9 @@ This Streamlit app offers two main features:
 import streamlit as st
 
 
-# Global app configuration
-st.set_page_config(
-    page_title="Assistant Power & Gas",
-    page_icon="🔌",
-    layout="wide",
-)
-
-# Custom CSS styles for the UI
-st.markdown(
-    """
+# Custom CSS styles for the UI (module-level so the string is built once;
+# it must still be emitted on each rerun since Streamlit repaints the page)
+_CSS_ACCUEIL = """
     <style>
     .block-container {padding-top: 1.5rem;}
     .hero {
@@ -92,10 +85,18 @@ st.markdown(
         letter-spacing: .02em;
     }
     </style>
-    """,
-    unsafe_allow_html=True,
+    """
+
+# Global app configuration
+st.set_page_config(
+    page_title="Assistant Power & Gas",
+    page_icon="🔌",
+    layout="wide",
 )
 
+# Inject the custom styles
+st.markdown(_CSS_ACCUEIL, unsafe_allow_html=True)
+
 # Hero section with title and description
 st.markdown(
     """
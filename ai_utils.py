@@ -4,52 +4,211 @@ AI utilities.
 This module centralizes helper functions to communicate with the Groq API
 and to generate automated answers for the chatbot and the email page.
 """
+import asyncio
+import functools
+import importlib.util
 import os
-from typing import Dict, List, Optional
-
-# Try to import Groq. If unavailable, set the symbol to None
-try:
-    from groq import Groq
-except ImportError:
-    Groq = None
+import re
+import time
+from typing import Dict, Iterator, List, Optional
 
 
 # Default model and generation constants
 MODELE_PAR_DEFAUT = "llama-3.1-8b-instant"
+# Minimum delay between two UI flushes of a streamed answer (~60 Hz)
+INTERVALLE_FLUSH_FLUX = 1 / 60
 TEMPERATURE_CHATBOT = 0.2
 TEMPERATURE_EMAIL = 0.3
 TOKENS_MAX_CHATBOT = 1200
 TOKENS_MAX_EMAIL = 900
 
+# Dictionnaire des tons disponibles pour les réponses e-mail
+TONS_DISPONIBLES = {
+    "professionnel": "professionnel et poli",
+    "empathique": "empathique et rassurant",
+    "ferme": "ferme mais courtois",
+    "convivial": "amical et accessible",
+}
+
+# Dictionnaire des langues supportées
+LANGUES_DISPONIBLES = {"fr": "en français", "en": "in English"}
+
+# Instructions système des réponses e-mail, par langue. Built once and kept
+# byte-identical across calls so Groq's prompt cache can hit.
+_PROMPTS_SYS = {
+    "fr": (
+        "Tu es un assistant qui rédige des réponses d'e-mails claires, "
+        "concises et structurées. Respecte le ton demandé, garde un style "
+        "professionnel, et fournis seulement le corps de l'e-mail sans "
+        "balises techniques ni mise en forme riche. Utilise des paragraphes "
+        "courts et, si utile, des puces."
+    ),
+    "en": (
+        "You are an assistant who writes clear, concise and well-structured "
+        "email replies. Use the requested tone. Answer strictly in English. "
+        "Return only the email body in plain text. Prefer short paragraphs "
+        "and bullet points when useful."
+    ),
+}
+
+# Gabarits du message utilisateur et préfixe des contraintes, par langue
+_MODELES_MESSAGE = {
+    "fr": (
+        "Rédige une réponse {langue}, ton {ton}.\n"
+        "E-mail reçu:\n---\n{texte}\n---\n"
+    ),
+    "en": (
+        "Write the reply {langue}, tone {ton}.\n"
+        "Incoming email:\n---\n{texte}\n---\n"
+    ),
+}
+_PREFIX_CONTRAINTES = {
+    "fr": "Contraintes supplémentaires: ",
+    "en": "Additional constraints: ",
+}
+
+# Keyword patterns for the fallback answer, compiled once: a single scan
+# over the text instead of one substring search per keyword
+_RE_TARIFS = re.compile(r"tarif|prix|kwh|augmentation|facture", re.IGNORECASE)
+_RE_GAZ = re.compile(r"gaz|m3|pcs|pci|coefficient", re.IGNORECASE)
+
+# Prompt tokens served from Groq's server-side cache on the last call.
+# Kept per-session in st.session_state under _CLE_TOKENS_CACHES; the module
+# global is only the fallback for CLI use, where a single caller owns the
+# process.
+_derniers_tokens_caches: Optional[int] = None
+_CLE_TOKENS_CACHES = "_tokens_caches_groq"
+
+# Session-state key holding the stream currently being consumed
+_CLE_FLUX_ACTIF = "_flux_groq_actif"
+
+
+def _enregistrer_flux_actif(flux) -> None:
+    """
+    Remember the live Groq stream in session state.
+
+    Lets a later turn abort a still-running generation instead of letting
+    two completions run concurrently.
 
-def recuperer_cle_groq(cle_explicite: Optional[str]) -> Optional[str]:
+    Args:
+        flux: The stream object returned by the Groq SDK.
     """
-    Retrieve a Groq API key from multiple possible sources.
+    try:
+        import streamlit as st
 
-    Resolution order:
-    1) The explicit function argument
-    2) Environment variable GROQ_API_KEY
-    3) Streamlit secrets
+        st.session_state[_CLE_FLUX_ACTIF] = flux
+    except Exception:
+        # Outside Streamlit there is nothing to track
+        pass
+
+
+def _liberer_flux_actif(flux) -> None:
+    """
+    Clear the active-stream slot once consumption of `flux` is over.
+
+    The pop is conditional: an abandoned generator may be finalized after
+    a newer turn has registered its own stream, and must not unregister it.
 
     Args:
-        cle_explicite: API key provided directly to the function.
+        flux: The stream whose registration should be released.
+    """
+    try:
+        import streamlit as st
+
+        if st.session_state.get(_CLE_FLUX_ACTIF) is flux:
+            st.session_state.pop(_CLE_FLUX_ACTIF, None)
+    except Exception:
+        pass
+
+
+def fermer_flux_actif() -> None:
+    """
+    Close the in-flight Groq stream from a previous turn, if any.
+
+    Closing the iterator drops the HTTP connection, which ends generation
+    server-side and stops burning tokens on an answer nobody will read.
+    """
+    try:
+        import streamlit as st
+
+        flux = st.session_state.pop(_CLE_FLUX_ACTIF, None)
+    except Exception:
+        return
+
+    if flux is not None:
+        try:
+            flux.close()
+        except Exception:
+            # The stream may already be finished or broken
+            pass
+
+
+def tokens_caches_dernier_appel() -> Optional[int]:
+    """
+    Return the number of cached prompt tokens reported for the last call.
+
+    Groq automatically caches repeated prompt prefixes server-side; this
+    exposes the cache-hit count so the UI can surface it.
 
     Returns:
-        The resolved API key or None if it cannot be found.
+        The cached token count, or None if unknown.
     """
-    # First, check the explicit argument
-    if cle_explicite and cle_explicite.strip():
-        return cle_explicite.strip()
+    try:
+        import streamlit as st
 
-    # Then check environment variables
+        return st.session_state.get(_CLE_TOKENS_CACHES)
+    except Exception:
+        return _derniers_tokens_caches
+
+
+def _enregistrer_tokens_caches(usage) -> None:
+    """
+    Extract and store the cached-token count from a usage payload.
+
+    Args:
+        usage: Usage object attached to a completion or final stream chunk.
+    """
+    if usage is None:
+        return
+
+    # Groq reports cache hits either directly or under prompt_tokens_details
+    caches = getattr(usage, "cached_tokens", None)
+    if caches is None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        caches = getattr(details, "cached_tokens", None)
+
+    # Store per session so one user's badge never shows another's count
+    try:
+        import streamlit as st
+
+        st.session_state[_CLE_TOKENS_CACHES] = caches
+    except Exception:
+        # Outside Streamlit a process-wide value is fine
+        global _derniers_tokens_caches
+        _derniers_tokens_caches = caches
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_key_from_env_and_secrets() -> Optional[str]:
+    """
+    Resolve the Groq API key from the environment or Streamlit secrets.
+
+    Cached for the process lifetime: the key does not change at runtime and
+    reading st.secrets goes through a TOML parser, which is not free when
+    done on every chat turn.
+
+    Returns:
+        The resolved API key or None if it cannot be found.
+    """
+    # Check environment variables first
     cle_env = os.getenv("GROQ_API_KEY")
     if cle_env:
         return cle_env
 
-    # Finally, try Streamlit secrets
+    # Then try Streamlit secrets
     try:
         import streamlit as st
-        
+
         cle_secrete = st.secrets.get("GROQ_API_KEY")
         if cle_secrete:
             return str(cle_secrete)
@@ -60,6 +219,139 @@ def recuperer_cle_groq(cle_explicite: Optional[str]) -> Optional[str]:
     return None
 
 
+def recuperer_cle_groq(cle_explicite: Optional[str]) -> Optional[str]:
+    """
+    Retrieve a Groq API key from multiple possible sources.
+
+    Resolution order:
+    1) The explicit function argument
+    2) Environment variable GROQ_API_KEY
+    3) Streamlit secrets
+
+    Args:
+        cle_explicite: API key provided directly to the function.
+
+    Returns:
+        The resolved API key or None if it cannot be found.
+    """
+    # First, check the explicit argument
+    if cle_explicite and cle_explicite.strip():
+        return cle_explicite.strip()
+
+    # Fall back to the cached environment/secrets lookup
+    return _resolve_key_from_env_and_secrets()
+
+
+@functools.lru_cache(maxsize=1)
+def _groq_disponible() -> bool:
+    """
+    Check once whether the groq SDK is importable, without importing it.
+
+    Returns:
+        True when the groq package is installed.
+    """
+    return importlib.util.find_spec("groq") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _charger_classes_groq():
+    """
+    Import the Groq client classes on first use.
+
+    Deferring the import keeps it off the cold-start path of sessions that
+    only ever hit the fallback.
+
+    Returns:
+        The (Groq, AsyncGroq) class pair.
+
+    Raises:
+        RuntimeError: If Groq SDK is not installed.
+    """
+    try:
+        from groq import AsyncGroq, Groq
+    except ImportError:
+        raise RuntimeError("La librairie Groq n'est pas installée")
+
+    return Groq, AsyncGroq
+
+
+@functools.lru_cache(maxsize=1)
+def _classe_client_http():
+    """
+    Build (once) an httpx.Client subclass that encodes JSON with orjson.
+
+    Each Groq call re-serializes the whole messages list; orjson encodes
+    3-5x faster than the stdlib json used by httpx. Returns None when
+    orjson is not installed, in which case the SDK default client is used.
+
+    Returns:
+        The client class, or None if orjson is unavailable.
+    """
+    try:
+        import httpx
+        import orjson
+    except ImportError:
+        return None
+
+    class _ClientHttpOrjson(httpx.Client):
+        """httpx client whose JSON request bodies are encoded with orjson."""
+
+        def build_request(self, method, url, **kwargs):
+            corps_json = kwargs.pop("json", None)
+            if corps_json is not None and kwargs.get("content") is None:
+                kwargs["content"] = orjson.dumps(
+                    corps_json, option=orjson.OPT_NON_STR_KEYS
+                )
+                en_tetes = httpx.Headers(kwargs.get("headers"))
+                en_tetes.setdefault("content-type", "application/json")
+                kwargs["headers"] = en_tetes
+            else:
+                kwargs["json"] = corps_json
+            return super().build_request(method, url, **kwargs)
+
+    return _ClientHttpOrjson
+
+
+def _construire_client_groq(cle_api: Optional[str]):
+    """
+    Build a Groq client for the given API key (uncached).
+
+    Args:
+        cle_api: Groq API key, or None to let the SDK read the environment.
+
+    Returns:
+        A configured Groq client.
+
+    Raises:
+        RuntimeError: If Groq SDK is not installed.
+    """
+    classe_groq, _ = _charger_classes_groq()
+
+    options = {}
+    if cle_api:
+        options["api_key"] = cle_api
+
+    # Serialize request bodies with orjson when available
+    classe_http = _classe_client_http()
+    if classe_http is not None:
+        options["http_client"] = classe_http()
+
+    return classe_groq(**options)
+
+
+# Memoize the client so the underlying httpx connection pool is reused
+# across Streamlit reruns instead of paying TLS setup per message.
+# Fall back to a plain lru_cache when Streamlit is not available (CLI use).
+try:
+    import streamlit as _st
+
+    _get_groq_client = _st.cache_resource(_construire_client_groq)
+    _cache_secours = _st.cache_data(ttl=3600)
+except Exception:
+    _get_groq_client = functools.lru_cache(maxsize=4)(_construire_client_groq)
+    _cache_secours = functools.lru_cache(maxsize=128)
+
+
 def construire_messages(
     message_utilisateur: Optional[str],
     prompt_systeme: Optional[str],
@@ -85,13 +377,14 @@ def construire_messages(
     if prompt_systeme:
         messages.append({"role": "system", "content": prompt_systeme})
 
-    # Then append previous conversation messages
+    # Then append previous conversation messages, skipping empty ones.
+    # extend with a generator keeps the loop in C instead of Python.
     if historique:
-        for message in historique:
-            role = message.get("role", "user")
-            contenu = message.get("content", "")
-            if contenu:  # Skip empty messages
-                messages.append({"role": role, "content": contenu})
+        messages.extend(
+            {"role": message.get("role", "user"), "content": contenu}
+            for message in historique
+            if (contenu := message.get("content"))
+        )
 
     # Finally append the current user message
     if message_utilisateur:
@@ -123,15 +416,9 @@ def appeler_groq(
     Raises:
         RuntimeError: If Groq SDK is not installed.
     """
-    if Groq is None:
-        raise RuntimeError("La librairie Groq n'est pas installée")
+    # Reuse the cached Groq client
+    client = _get_groq_client(cle_api)
 
-    # Create Groq client
-    if cle_api:
-        client = Groq(api_key=cle_api)
-    else:
-        client = Groq()
-    
     # Perform the API call
     completion = client.chat.completions.create(
         model=modele,
@@ -140,11 +427,152 @@ def appeler_groq(
         max_tokens=tokens_max,
     )
     
+    # Record prompt-cache statistics for the UI
+    x_groq = getattr(completion, "x_groq", None)
+    _enregistrer_tokens_caches(
+        getattr(x_groq, "usage", None) or getattr(completion, "usage", None)
+    )
+
+    # Extract and trim the answer
+    contenu = completion.choices[0].message.content or ""
+    return contenu.strip()
+
+
+def appeler_groq_stream(
+    messages: List[Dict[str, str]],
+    modele: str,
+    temperature: float,
+    tokens_max: int,
+    cle_api: Optional[str],
+) -> Iterator[str]:
+    """
+    Call Groq chat completions API in streaming mode and yield text deltas.
+
+    Unlike appeler_groq, tokens are yielded as soon as the server emits them,
+    which greatly reduces the perceived latency in the UI.
+
+    Args:
+        messages: Message list to send to the API.
+        modele: Model name to use.
+        temperature: Creativity level (0.0–1.0).
+        tokens_max: Maximum number of tokens to generate.
+        cle_api: Groq API key.
+
+    Yields:
+        Successive chunks of the assistant text content.
+
+    Raises:
+        RuntimeError: If Groq SDK is not installed.
+    """
+    # Reuse the cached Groq client
+    client = _get_groq_client(cle_api)
+
+    # Perform the API call in streaming mode (SSE)
+    flux = client.chat.completions.create(
+        model=modele,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=tokens_max,
+        stream=True,
+    )
+
+    # Track the stream so a newer turn can abort it
+    _enregistrer_flux_actif(flux)
+
+    try:
+        # Yield each non-empty delta as it arrives
+        for morceau in flux:
+            delta = morceau.choices[0].delta.content
+            if delta:
+                yield delta
+
+            # The final chunk carries usage statistics under x_groq
+            x_groq = getattr(morceau, "x_groq", None)
+            if x_groq is not None:
+                _enregistrer_tokens_caches(getattr(x_groq, "usage", None))
+    finally:
+        # Always release our registration, even if the consumer stops early
+        _liberer_flux_actif(flux)
+
+
+async def appeler_groq_async(
+    messages: List[Dict[str, str]],
+    modele: str,
+    temperature: float,
+    tokens_max: int,
+    cle_api: Optional[str],
+) -> str:
+    """
+    Asynchronous counterpart of appeler_groq.
+
+    Useful to overlap several Groq calls on the wire with asyncio.gather
+    instead of paying sequential round trips.
+
+    Args:
+        messages: Message list to send to the API.
+        modele: Model name to use.
+        temperature: Creativity level (0.0–1.0).
+        tokens_max: Maximum number of tokens to generate.
+        cle_api: Groq API key.
+
+    Returns:
+        The assistant text content.
+
+    Raises:
+        RuntimeError: If Groq SDK is not installed.
+    """
+    # Create the async Groq client
+    _, classe_async = _charger_classes_groq()
+    client = classe_async(api_key=cle_api) if cle_api else classe_async()
+
+    # Perform the API call
+    completion = await client.chat.completions.create(
+        model=modele,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=tokens_max,
+    )
+
     # Extract and trim the answer
     contenu = completion.choices[0].message.content or ""
     return contenu.strip()
 
 
+def _coalescer_flux(
+    flux: Iterator[str],
+    intervalle: float = INTERVALLE_FLUSH_FLUX,
+) -> Iterator[str]:
+    """
+    Buffer streamed chunks and flush them on a fixed cadence.
+
+    Groq can emit hundreds of tokens per second; pushing each one through
+    Streamlit triggers a rerun per token. Coalescing keeps the rendering
+    cost proportional to frames (~60/s) instead of tokens.
+
+    Args:
+        flux: Source iterator of text chunks.
+        intervalle: Minimum delay in seconds between two flushes.
+
+    Yields:
+        Accumulated text chunks, at most once per intervalle.
+    """
+    tampon = ""
+    dernier_flush = time.monotonic()
+
+    for morceau in flux:
+        tampon += morceau
+        maintenant = time.monotonic()
+        if maintenant - dernier_flush >= intervalle:
+            yield tampon
+            tampon = ""
+            dernier_flush = maintenant
+
+    # Flush whatever remains at stream end
+    if tampon:
+        yield tampon
+
+
+@_cache_secours
 def reponse_de_secours(texte_utilisateur: str, domaine: str = "energy") -> str:
     """
     Generate a deterministic fallback answer when the API is unavailable.
@@ -156,12 +584,9 @@ def reponse_de_secours(texte_utilisateur: str, domaine: str = "energy") -> str:
     Returns:
         A simple, informative fallback reply.
     """
-    texte = texte_utilisateur.lower()
-    
     if domaine == "energy":
         # Tariff and invoice related keywords
-        mots_cles_tarifs = ["tarif", "prix", "kwh", "augmentation", "facture"]
-        if any(mot in texte for mot in mots_cles_tarifs):
+        if _RE_TARIFS.search(texte_utilisateur):
             return (
                 "Sans accès à l'IA, voici une indication générale : "
                 "les tarifs électricité et gaz évoluent en fonction du marché, "
@@ -173,8 +598,7 @@ def reponse_de_secours(texte_utilisateur: str, domaine: str = "energy") -> str:
             )
         
         # Gas related keywords
-        mots_cles_gaz = ["gaz", "m3", "pcs", "pci", "coefficient"]
-        if any(mot in texte for mot in mots_cles_gaz):
+        if _RE_GAZ.search(texte_utilisateur):
             return (
                 "Pour le gaz, la facturation se fait en kWh via un coefficient "
                 "de conversion (m³ → kWh) dépendant du pouvoir calorifique "
@@ -221,25 +645,26 @@ def generer_reponse_ia(
     Returns:
         The generated answer or a fallback response.
     """
-    # Build the full message list
-    messages_complets = construire_messages(
-        message_utilisateur, prompt_systeme, messages
-    )
-
     try:
-        # Resolve API key
+        # Resolve API key first: no point building messages when the call
+        # cannot happen and the fallback is guaranteed
         cle_resolue = recuperer_cle_groq(cle_api)
-        
+
         # If no key and Groq SDK missing, use fallback
-        if not cle_resolue and Groq is None:
+        if not cle_resolue and not _groq_disponible():
             return reponse_de_secours(
                 message_utilisateur or "", domaine=domaine_secours
             )
-        
+
         # Ensure a default model
         if not modele:
             modele = MODELE_PAR_DEFAUT
-        
+
+        # Build the full message list
+        messages_complets = construire_messages(
+            message_utilisateur, prompt_systeme, messages
+        )
+
         # Perform the Groq call
         return appeler_groq(
             messages=messages_complets,
@@ -256,6 +681,74 @@ def generer_reponse_ia(
         )
 
 
+def generer_reponse_ia_stream(
+    message_utilisateur: Optional[str] = None,
+    *,
+    prompt_systeme: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    cle_api: Optional[str] = None,
+    modele: str = MODELE_PAR_DEFAUT,
+    temperature: float = TEMPERATURE_CHATBOT,
+    tokens_max: int = TOKENS_MAX_CHATBOT,
+    domaine_secours: str = "energy",
+) -> Iterator[str]:
+    """
+    Generate an AI answer as a stream of text chunks.
+
+    Streaming counterpart of generer_reponse_ia, meant to be consumed by
+    st.write_stream. On any failure the fallback answer is yielded as a
+    single chunk.
+
+    Args:
+        message_utilisateur: Current user message.
+        prompt_systeme: Assistant instructions.
+        messages: Conversation history.
+        cle_api: Groq API key.
+        modele: Model name.
+        temperature: Creativity level.
+        tokens_max: Max generated tokens.
+        domaine_secours: Fallback domain hint.
+
+    Yields:
+        Successive chunks of the generated answer, or the fallback response.
+    """
+    try:
+        # Resolve API key first: no point building messages when the call
+        # cannot happen and the fallback is guaranteed
+        cle_resolue = recuperer_cle_groq(cle_api)
+
+        # If no key and Groq SDK missing, use fallback
+        if not cle_resolue and not _groq_disponible():
+            yield reponse_de_secours(
+                message_utilisateur or "", domaine=domaine_secours
+            )
+            return
+
+        # Ensure a default model
+        if not modele:
+            modele = MODELE_PAR_DEFAUT
+
+        # Build the full message list
+        messages_complets = construire_messages(
+            message_utilisateur, prompt_systeme, messages
+        )
+
+        # Relay the streamed chunks, coalesced to ~60 flushes/s
+        yield from _coalescer_flux(appeler_groq_stream(
+            messages=messages_complets,
+            modele=modele,
+            temperature=temperature,
+            tokens_max=tokens_max,
+            cle_api=cle_resolue,
+        ))
+
+    except Exception:
+        # On any exception, yield the fallback answer as one chunk
+        yield reponse_de_secours(
+            message_utilisateur or "", domaine=domaine_secours
+        )
+
+
 def generer_reponse_email(
     texte_email: str,
     *,
@@ -283,63 +776,65 @@ def generer_reponse_email(
     Returns:
         The generated email body text.
     """
-    # Dictionnaire des tons disponibles
-    tons_disponibles = {
-        "professionnel": "professionnel et poli",
-        "empathique": "empathique et rassurant",
-        "ferme": "ferme mais courtois",
-        "convivial": "amical et accessible",
-    }
-    ton_choisi = tons_disponibles.get(
-        ton.lower(), tons_disponibles["professionnel"]
+    prompt_systeme, message_utilisateur = _preparer_prompt_email(
+        texte_email,
+        ton=ton,
+        langue=langue,
+        instructions_supplementaires=instructions_supplementaires,
     )
 
-    # Dictionnaire des langues
-    langues_disponibles = {"fr": "en français", "en": "in English"}
-    langue_choisie = langues_disponibles.get(
-        langue.lower(), langues_disponibles["fr"]
+    # Génération de la réponse
+    return generer_reponse_ia(
+        message_utilisateur=message_utilisateur,
+        prompt_systeme=prompt_systeme,
+        messages=None,
+        cle_api=cle_api,
+        modele=modele,
+        temperature=temperature,
+        tokens_max=tokens_max,
+        domaine_secours="email",
     )
 
-    # Instructions pour l'IA (adaptées à la langue demandée)
-    if langue.lower() == "en":
-        prompt_systeme = (
-            "You are an assistant who writes clear, concise and well-structured "
-            "email replies. Use the requested tone. Answer strictly in English. "
-            "Return only the email body in plain text. Prefer short paragraphs "
-            "and bullet points when useful."
-        )
-    else:
-        prompt_systeme = (
-            "Tu es un assistant qui rédige des réponses d'e-mails claires, "
-            "concises et structurées. Respecte le ton demandé, garde un style "
-            "professionnel, et fournis seulement le corps de l'e-mail sans "
-            "balises techniques ni mise en forme riche. Utilise des paragraphes "
-            "courts et, si utile, des puces."
-        )
 
-    # Construction du message utilisateur (adapté à la langue)
-    if langue.lower() == "en":
-        message_utilisateur = (
-            f"Write the reply {langue_choisie}, tone {ton_choisi}.\n"
-            f"Incoming email:\n---\n{texte_email}\n---\n"
-        )
-        prefix_contraintes = "Additional constraints: "
-    else:
-        message_utilisateur = (
-            f"Rédige une réponse {langue_choisie}, ton {ton_choisi}.\n"
-            f"E-mail reçu:\n---\n{texte_email}\n---\n"
-        )
-        prefix_contraintes = "Contraintes supplémentaires: "
-    
-    # Ajout des instructions supplémentaires si présentes
-    if instructions_supplementaires and instructions_supplementaires.strip():
-        message_utilisateur += (
-            f"{prefix_contraintes}"
-            f"{instructions_supplementaires.strip()}\n"
-        )
+def generer_reponse_email_stream(
+    texte_email: str,
+    *,
+    ton: str = "professionnel",
+    langue: str = "fr",
+    instructions_supplementaires: Optional[str] = None,
+    cle_api: Optional[str] = None,
+    modele: str = MODELE_PAR_DEFAUT,
+    temperature: float = TEMPERATURE_EMAIL,
+    tokens_max: int = TOKENS_MAX_EMAIL,
+) -> Iterator[str]:
+    """
+    Generate an email reply as a stream of text chunks.
 
-    # Génération de la réponse
-    return generer_reponse_ia(
+    Streaming counterpart of generer_reponse_email, meant to be consumed by
+    st.write_stream.
+
+    Args:
+        texte_email: Incoming email body.
+        ton: Requested tone (e.g., "professionnel").
+        langue: "fr" or "en".
+        instructions_supplementaires: Optional extra constraints.
+        cle_api: Groq API key.
+        modele: Model name.
+        temperature: Creativity level.
+        tokens_max: Max generated tokens.
+
+    Yields:
+        Successive chunks of the generated email body text.
+    """
+    prompt_systeme, message_utilisateur = _preparer_prompt_email(
+        texte_email,
+        ton=ton,
+        langue=langue,
+        instructions_supplementaires=instructions_supplementaires,
+    )
+
+    # Génération de la réponse en streaming
+    yield from generer_reponse_ia_stream(
         message_utilisateur=message_utilisateur,
         prompt_systeme=prompt_systeme,
         messages=None,
@@ -351,3 +846,125 @@ def generer_reponse_email(
     )
 
 
+async def generer_reponses_email_batch(
+    texte_email: str,
+    tons: List[str],
+    *,
+    langue: str = "fr",
+    instructions_supplementaires: Optional[str] = None,
+    cle_api: Optional[str] = None,
+    modele: str = MODELE_PAR_DEFAUT,
+    temperature: float = TEMPERATURE_EMAIL,
+    tokens_max: int = TOKENS_MAX_EMAIL,
+) -> Dict[str, str]:
+    """
+    Generate email replies for several tones concurrently.
+
+    The N Groq calls overlap on the wire via asyncio.gather, so total wall
+    time is roughly the slowest call instead of the sum of all calls.
+
+    Args:
+        texte_email: Incoming email body.
+        tons: Tones to generate (e.g., ["professionnel", "ferme"]).
+        langue: "fr" or "en".
+        instructions_supplementaires: Optional extra constraints.
+        cle_api: Groq API key.
+        modele: Model name.
+        temperature: Creativity level.
+        tokens_max: Max generated tokens per reply.
+
+    Returns:
+        A dict mapping each tone to its generated (or fallback) reply.
+    """
+    cle_resolue = recuperer_cle_groq(cle_api)
+
+    # Build one message payload per requested tone
+    charges = []
+    for ton in tons:
+        prompt_systeme, message_utilisateur = _preparer_prompt_email(
+            texte_email,
+            ton=ton,
+            langue=langue,
+            instructions_supplementaires=instructions_supplementaires,
+        )
+        charges.append(
+            construire_messages(message_utilisateur, prompt_systeme, None)
+        )
+
+    # Fan the calls out concurrently
+    resultats = await asyncio.gather(
+        *[
+            appeler_groq_async(
+                messages=charge,
+                modele=modele or MODELE_PAR_DEFAUT,
+                temperature=temperature,
+                tokens_max=tokens_max,
+                cle_api=cle_resolue,
+            )
+            for charge in charges
+        ],
+        return_exceptions=True,
+    )
+
+    # Map results back to tones, falling back per failed call
+    reponses = {}
+    for ton, resultat in zip(tons, resultats):
+        if isinstance(resultat, Exception):
+            reponses[ton] = reponse_de_secours(texte_email, domaine="email")
+        else:
+            reponses[ton] = resultat
+    return reponses
+
+
+def _preparer_prompt_email(
+    texte_email: str,
+    *,
+    ton: str,
+    langue: str,
+    instructions_supplementaires: Optional[str],
+) -> tuple:
+    """
+    Build the (system prompt, user message) pair for an email reply.
+
+    Args:
+        texte_email: Incoming email body.
+        ton: Requested tone (e.g., "professionnel").
+        langue: "fr" or "en".
+        instructions_supplementaires: Optional extra constraints.
+
+    Returns:
+        A (prompt_systeme, message_utilisateur) tuple.
+    """
+    # Résolution du ton et de la langue depuis les constantes du module
+    langue_normalisee = langue.lower()
+    if langue_normalisee not in LANGUES_DISPONIBLES:
+        langue_normalisee = "fr"
+    ton_choisi = TONS_DISPONIBLES.get(
+        ton.lower(), TONS_DISPONIBLES["professionnel"]
+    )
+    langue_choisie = LANGUES_DISPONIBLES[langue_normalisee]
+
+    # Instructions et gabarits précalculés par langue
+    prompt_systeme = _PROMPTS_SYS[langue_normalisee]
+
+    # Assemble the user message from parts: join stays O(n) however many
+    # constraint blocks get added over time
+    parties = [
+        _MODELES_MESSAGE[langue_normalisee].format(
+            langue=langue_choisie,
+            ton=ton_choisi,
+            texte=texte_email,
+        )
+    ]
+
+
+    # Ajout des instructions supplémentaires si présentes
+    if instructions_supplementaires and instructions_supplementaires.strip():
+        parties.append(
+            f"{_PREFIX_CONTRAINTES[langue_normalisee]}"
+            f"{instructions_supplementaires.strip()}\n"
+        )
+
+    return prompt_systeme, "".join(parties)
+
+
@@ -0,0 +1,13 @@
+"""
+Shared constants.
+
+Values used by several pages live here so each Streamlit rerun reuses the
+same objects instead of rebuilding them.
+"""
+
+# Groq models selectable in the sidebar of both pages
+MODELES = (
+    "llama-3.1-8b-instant",
+    "gemma2-9b-it",
+    "llama-3.3-70b-versatile",
+)
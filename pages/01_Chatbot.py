@@ -4,11 +4,139 @@ Chatbot page for electricity and gas questions.
 This page lets users ask energy-related questions and get AI answers using
 Groq, keeping the chat history within the Streamlit session state.
 """
-from typing import Dict, List
+import json
+import tempfile
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List
 
 import streamlit as st
 
-from ai_utils import generer_reponse_ia
+from ai_utils import (
+    fermer_flux_actif,
+    generer_reponse_ia_stream,
+    tokens_caches_dernier_appel,
+)
+from constants import MODELES
+
+
+# Number of recent turns sent to the model on each call
+FENETRE_HISTORIQUE = 12
+
+# Maximum number of messages kept in session state; older ones are
+# archived on disk so per-user memory stays bounded
+TAILLE_MAX_HISTORIQUE = 50
+
+
+def _chemin_archive() -> Path:
+    """
+    Return the on-disk archive path for this session's overflow messages.
+
+    Returns:
+        A per-session JSON file path under the system temp directory.
+    """
+    if "_id_session_chat" not in st.session_state:
+        st.session_state["_id_session_chat"] = uuid.uuid4().hex
+    identifiant = st.session_state["_id_session_chat"]
+    return Path(tempfile.gettempdir()) / f"energy_chat_{identifiant}.json"
+
+
+def _archiver_message(message: Dict[str, str]) -> None:
+    """
+    Append a message evicted from the in-memory history to the archive.
+
+    The archive is JSON-lines: one message per line, appended in O(1)
+    instead of re-parsing and rewriting the whole file on each eviction.
+
+    Args:
+        message: The chat message about to be dropped from the deque.
+    """
+    try:
+        with open(_chemin_archive(), "a", encoding="utf-8") as fichier:
+            fichier.write(json.dumps(message, ensure_ascii=False) + "\n")
+    except (OSError, ValueError):
+        # Archiving is best effort; never break the chat over it
+        pass
+
+
+def _lire_archive() -> List[Dict[str, str]]:
+    """
+    Read the archived messages from disk, skipping unreadable lines.
+
+    Returns:
+        The archived messages, oldest first.
+    """
+    archives = []
+    try:
+        with open(_chemin_archive(), encoding="utf-8") as fichier:
+            for ligne in fichier:
+                ligne = ligne.strip()
+                if not ligne:
+                    continue
+                try:
+                    archives.append(json.loads(ligne))
+                except ValueError:
+                    # A truncated line (non-atomic write) is not fatal
+                    continue
+    except OSError:
+        pass
+    return archives
+
+
+def _ajouter_message(message: Dict[str, str]) -> None:
+    """
+    Append a message to the bounded history, archiving the evicted one.
+
+    Args:
+        message: The chat message to store.
+    """
+    historique = st.session_state[cle_historique]
+    if len(historique) == historique.maxlen:
+        _archiver_message(historique[0])
+        # The eviction shifts indexes left; keep the render cursor aligned
+        if st.session_state.get("_last_rendered_idx", 0) > 0:
+            st.session_state["_last_rendered_idx"] -= 1
+    historique.append(message)
+
+
+def _afficher_nouveaux_messages(conteneur) -> None:
+    """
+    Paint only the messages not yet rendered during this run.
+
+    Args:
+        conteneur: The persistent container holding the conversation.
+    """
+    historique = st.session_state[cle_historique]
+    deja_rendus = st.session_state.get("_last_rendered_idx", 0)
+    for message in list(historique)[deja_rendus:]:
+        with conteneur.chat_message(message["role"]):
+            st.markdown(message["content"])
+    st.session_state["_last_rendered_idx"] = len(historique)
+
+
+def _fenetrer_historique(
+    historique: Iterable[Dict[str, str]],
+    garder: int = FENETRE_HISTORIQUE,
+) -> List[Dict[str, str]]:
+    """
+    Window the conversation history sent to the model.
+
+    Keeps the first two messages plus the `garder` most recent ones so cost
+    and latency stay bounded while the stable prefix remains byte-identical
+    across calls, letting Groq's automatic prompt caching kick in.
+
+    Args:
+        historique: Full conversation history.
+        garder: Number of recent messages to keep.
+
+    Returns:
+        The windowed history (or the full list when already short enough).
+    """
+    historique = list(historique)
+    if len(historique) <= garder + 2:
+        return historique
+    return historique[:2] + historique[-garder:]
 
 
 # Page configuration
@@ -72,12 +200,9 @@ with st.sidebar:
     # Model selection
     modele_choisi = st.selectbox(
         "Modèle",
-        options=[
-            "llama-3.1-8b-instant",
-            "gemma2-9b-it",
-            "llama-3.3-70b-versatile",
-        ],
+        options=MODELES,
         index=0,
+        key="modele_selectbox",
     )
 
     # Creativity (temperature)
@@ -95,13 +220,15 @@ with st.sidebar:
     # Button to clear history
     effacer_historique = st.button("Effacer l'historique")
 
-# Conversation history initialization
+# Conversation history initialization (bounded to avoid unbounded growth)
 cle_historique = "energy_chat_history"
 if cle_historique not in st.session_state or effacer_historique:
-    st.session_state[cle_historique] = []
+    st.session_state[cle_historique] = deque(maxlen=TAILLE_MAX_HISTORIQUE)
+    if effacer_historique:
+        _chemin_archive().unlink(missing_ok=True)
 
-# Base system instructions for the assistant
-prompt_systeme_base = (
+# Base system instructions for the assistant (constant across reruns)
+PROMPT_SYSTEME_BASE = (
     "Tu es un assistant expert en électricité et gaz en France. "
     "Réponds en français, de manière rigoureuse et actionnable. "
     "Couvre notamment : tarifs réglementés et offres de marché, "
@@ -115,18 +242,32 @@ prompt_systeme_base = (
     "indique la méthode de calcul. Ne donne pas de conseils financiers."
 )
 
-# Append source citation instructions if enabled
-prompt_systeme_final = prompt_systeme_base
+# Append source citation instructions only when the mode is enabled
 if mode_sources:
-    prompt_systeme_final += (
+    prompt_systeme_final = PROMPT_SYSTEME_BASE + (
         " Cite explicitement au moins une source officielle pertinente "
         "avec un lien court: CRE, Enedis, GRDF, EDF, ENGIE, service‑public."
     )
+else:
+    prompt_systeme_final = PROMPT_SYSTEME_BASE
+
+# Older messages evicted from memory can be reloaded on demand. Expander
+# children run on every rerun, so the file read and render are gated
+# behind an explicit checkbox to stay truly lazy.
+if _chemin_archive().exists():
+    with st.expander("Voir l'historique complet"):
+        if st.checkbox("Charger l'historique archivé"):
+            for message in _lire_archive():
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
+
+# Persistent container holding the conversation for this run
+history_container = st.container()
 
-# Render prior messages
-for message in st.session_state[cle_historique]:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+# Paint the visible (bounded) tail of the conversation and position the
+# render cursor so new messages this run are appended, not repainted
+st.session_state["_last_rendered_idx"] = 0
+_afficher_nouveaux_messages(history_container)
 
 # Chat input
 question_utilisateur = st.chat_input(
@@ -136,43 +277,56 @@ question_utilisateur = st.chat_input(
 
 # Handle a new question
 if question_utilisateur:
-    # Add the user question to history
-    st.session_state[cle_historique].append({
-        "role": "user", 
+    # Abort any generation still in flight from the previous turn
+    fermer_flux_actif()
+
+    # Add the user question to history and paint it right away
+    _ajouter_message({
+        "role": "user",
         "content": question_utilisateur
     })
+    _afficher_nouveaux_messages(history_container)
 
     # Generate and show the assistant answer
-    with st.chat_message("assistant"):
-        with st.spinner("Rédaction de la réponse…"):
-            # Get the full history
-            historique_complet = st.session_state[cle_historique]
-            
-            # Adjust temperature if sources mode is active
-            if mode_sources:
-                temperature_effective = min(temperature, 0.3)
-            else:
-                temperature_effective = temperature
-            
-            # Generate the AI response
-            reponse = generer_reponse_ia(
-                message_utilisateur=None,
-                prompt_systeme=prompt_systeme_final,
-                messages=historique_complet,
-                modele=modele_choisi,
-                temperature=temperature_effective,
-                tokens_max=800,
-                domaine_secours="energy",
+    with history_container.chat_message("assistant"):
+        # Send a bounded window of the history instead of the whole list
+        historique_complet = _fenetrer_historique(
+            st.session_state[cle_historique]
+        )
+
+        # Adjust temperature if sources mode is active
+        if mode_sources:
+            temperature_effective = min(temperature, 0.3)
+        else:
+            temperature_effective = temperature
+
+        # Stream the AI response token by token
+        reponse = st.write_stream(generer_reponse_ia_stream(
+            message_utilisateur=None,
+            prompt_systeme=prompt_systeme_final,
+            messages=historique_complet,
+            modele=modele_choisi,
+            temperature=temperature_effective,
+            tokens_max=800,
+            domaine_secours="energy",
+        ))
+
+        # Surface Groq prompt-cache hits when reported
+        tokens_caches = tokens_caches_dernier_appel()
+        if tokens_caches:
+            st.caption(
+                f"⚡ Cache prompt Groq : {tokens_caches} tokens réutilisés"
             )
-            
-            # Render the answer
-            st.markdown(reponse)
-            
-            # Append assistant answer to history
-            st.session_state[cle_historique].append({
-                "role": "assistant", 
-                "content": reponse
-            })
+
+        # Append assistant answer to history; it is already on screen, so
+        # move the render cursor past it instead of repainting
+        _ajouter_message({
+            "role": "assistant",
+            "content": reponse
+        })
+        st.session_state["_last_rendered_idx"] = len(
+            st.session_state[cle_historique]
+        )
 
 # Divider and a short tip
 st.divider()
@@ -4,9 +4,58 @@ Email reply generator page.
 This page creates professional email replies based on the incoming email
 and the selected tone/language.
 """
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 
 from ai_utils import generer_reponse_email
+from constants import MODELES
+
+
+# All selectable tones, also used for the side-by-side comparison
+TONS_REPONSE = ["professionnel", "empathique", "ferme", "convivial"]
+
+# Style of the generated-reply box (module-level so the string is built once)
+_CSS_REPLY_BOX = """
+    <style>
+    .reply-box {
+        background: #f8f9fb;
+        padding: 16px 18px;
+        border-radius: 12px;
+        border: none;
+        box-shadow: 0 1px 2px rgba(0,0,0,0.06);
+        white-space: pre-wrap;
+        line-height: 1.55;
+    }
+    </style>
+    """
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _generer_reponse_email_cached(
+    texte: str,
+    ton: str,
+    langue: str,
+    instructions: str,
+    modele: str,
+    temperature: float,
+    tokens_max: int,
+) -> str:
+    """
+    Memoized email generation: identical inputs skip the Groq call.
+
+    The API key is resolved inside generer_reponse_email so it never enters
+    the cache key; the ttl bounds the cache memory footprint.
+    """
+    return generer_reponse_email(
+        texte_email=texte,
+        ton=ton,
+        langue=langue,
+        instructions_supplementaires=instructions,
+        modele=modele,
+        temperature=temperature,
+        tokens_max=tokens_max,
+    )
 
 
 st.set_page_config(
@@ -19,6 +68,9 @@ st.caption(
     "Rédigez automatiquement des réponses claires et professionnelles"
 )
 
+# Inject the reply-box style once at page top, not per generation
+st.markdown(_CSS_REPLY_BOX, unsafe_allow_html=True)
+
 with st.expander("ℹ️ Guide des paramètres IA"):
     st.markdown("""
     ### 🤖 Choix du modèle IA
@@ -69,12 +121,9 @@ with st.sidebar:
     # Model selection
     modele_choisi = st.selectbox(
         "Modèle",
-        options=[
-            "llama-3.1-8b-instant",
-            "gemma2-9b-it",
-            "llama-3.3-70b-versatile",
-        ],
+        options=MODELES,
         index=0,
+        key="modele_selectbox",
     )
     
     # Creativity (temperature) slider
@@ -86,42 +135,48 @@ with st.sidebar:
         0.05
     )
 
-# Two columns: subject and language
-colonne_objet, colonne_langue = st.columns([2, 1])
-with colonne_objet:
-    objet_email = st.text_input("Objet (optionnel)")
-with colonne_langue:
-    langue_reponse = st.selectbox("Langue", ["fr", "en"], index=0)
-
-# Text area for the incoming email
-texte_email_recu = st.text_area(
-    "E-mail reçu",
-    height=220,
-    placeholder=(
-        "Collez ici l'e-mail auquel répondre (plain text).\n"
-        "Ex: réclamation facture, demande d'informations, "
-        "relance commerciale, etc."
-    ),
-)
+# Group all inputs in a form: the script only reruns on explicit submit
+# instead of on every widget change
+with st.form("email_form"):
+    # Two columns: subject and language
+    colonne_objet, colonne_langue = st.columns([2, 1])
+    with colonne_objet:
+        objet_email = st.text_input("Objet (optionnel)")
+    with colonne_langue:
+        langue_reponse = st.selectbox("Langue", ["fr", "en"], index=0)
+
+    # Text area for the incoming email
+    texte_email_recu = st.text_area(
+        "E-mail reçu",
+        height=220,
+        placeholder=(
+            "Collez ici l'e-mail auquel répondre (plain text).\n"
+            "Ex: réclamation facture, demande d'informations, "
+            "relance commerciale, etc."
+        ),
+    )
 
-# Tone selection
-ton_reponse = st.radio(
-    "Ton",
-    options=["professionnel", "empathique", "ferme", "convivial"],
-    horizontal=True,
-)
+    # Tone selection
+    ton_reponse = st.radio(
+        "Ton",
+        options=TONS_REPONSE,
+        horizontal=True,
+    )
 
-# Additional constraints (optional)
-contraintes_supplementaires = st.text_input(
-    "Contraintes supplémentaires (optionnel)",
-    placeholder=(
-        "Ex: inclure références client, demander un justificatif, "
-        "fixer un délai…"
-    ),
-)
+    # Option to generate every tone at once (concurrent Groq calls)
+    comparer_tons = st.checkbox("Comparer les 4 tons")
 
-# Generate button
-generer_reponse = st.button("Générer la réponse")
+    # Additional constraints (optional)
+    contraintes_supplementaires = st.text_input(
+        "Contraintes supplémentaires (optionnel)",
+        placeholder=(
+            "Ex: inclure références client, demander un justificatif, "
+            "fixer un délai…"
+        ),
+    )
+
+    # Generate button (form submit)
+    generer_reponse = st.form_submit_button("Générer la réponse")
 
 # Handle generation
 if generer_reponse and texte_email_recu.strip():
@@ -131,48 +186,62 @@ if generer_reponse and texte_email_recu.strip():
     else:
         texte_source = texte_email_recu
     
-    # Generate the reply with a spinner
-    with st.spinner("Rédaction de l'e-mail…"):
-        reponse_generee = generer_reponse_email(
-            texte_email=texte_source,
-            ton=ton_reponse,
-            langue=langue_reponse,
-            instructions_supplementaires=contraintes_supplementaires,
-            modele=modele_choisi,
-            temperature=temperature,
-            tokens_max=700,
+    if comparer_tons:
+        # Generate the four tone variants concurrently; going through the
+        # cached wrapper means repeated comparisons are free
+        with st.spinner("Rédaction des 4 variantes…"):
+            with ThreadPoolExecutor(max_workers=len(TONS_REPONSE)) as pool:
+                taches = {
+                    ton: pool.submit(
+                        _generer_reponse_email_cached,
+                        texte_source,
+                        ton,
+                        langue_reponse,
+                        contraintes_supplementaires,
+                        modele_choisi,
+                        temperature,
+                        700,
+                    )
+                    for ton in TONS_REPONSE
+                }
+                reponses_par_ton = {
+                    ton: tache.result() for ton, tache in taches.items()
+                }
+
+        # Render the variants side by side
+        st.subheader("Réponses proposées")
+        colonnes = st.columns(len(TONS_REPONSE))
+        for colonne, ton in zip(colonnes, TONS_REPONSE):
+            with colonne:
+                st.markdown(f"**{ton.capitalize()}**")
+                st.markdown(reponses_par_ton[ton])
+    else:
+        # Generate the reply, served from the cache on identical inputs
+        with st.spinner("Rédaction de l'e-mail…"):
+            reponse_generee = _generer_reponse_email_cached(
+                texte_source,
+                ton_reponse,
+                langue_reponse,
+                contraintes_supplementaires,
+                modele_choisi,
+                temperature,
+                700,
+            )
+
+        # Display the reply with a styled box
+        st.subheader("Réponse proposée")
+        st.markdown(
+            f"<div class='reply-box'>{reponse_generee}</div>",
+            unsafe_allow_html=True
         )
 
-    # Display the reply with a styled box
-    st.subheader("Réponse proposée")
-    st.markdown(
-        """
-        <style>
-        .reply-box {
-            background: #f8f9fb;
-            padding: 16px 18px;
-            border-radius: 12px;
-            border: none;
-            box-shadow: 0 1px 2px rgba(0,0,0,0.06);
-            white-space: pre-wrap;
-            line-height: 1.55;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-    st.markdown(
-        f"<div class='reply-box'>{reponse_generee}</div>", 
-        unsafe_allow_html=True
-    )
-    
-    # Download button
-    st.download_button(
-        label="Télécharger .txt",
-        data=reponse_generee,
-        file_name="reponse_email.txt",
-        mime="text/plain",
-    )
+        # Download button
+        st.download_button(
+            label="Télécharger .txt",
+            data=reponse_generee,
+            file_name="reponse_email.txt",
+            mime="text/plain",
+        )
 
 # Final tip
 st.divider()